@@ -1,195 +1,290 @@
-from flask import Flask, request, jsonify, send_file
-from flask_cors import CORS
+from quart import Quart, request, jsonify, send_file
+from quart_cors import cors
 from werkzeug.utils import secure_filename
+import asyncio
+import hashlib
 import os
-import tempfile
 import io
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 import re
 
-# Import our file generators
-from generators.epub_generator import generate_epub
-from generators.pdf_generator import generate_pdf  
-from generators.docx_generator import generate_docx
-from generators.document_parser import extract_text_from_file, detect_document_structure
+# The file generators transitively pull in reportlab, ebooklib, lxml and
+# python-docx, which costs hundreds of ms of startup; each endpoint
+# imports what it needs on first use (cached in sys.modules after that).
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for all domains on all routes
-
-# Configure file uploads
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx'}
 
+# CPU-bound generation runs in worker processes so formatting can use
+# multiple cores despite the GIL; uploads are I/O-bound and only need threads.
+GENERATE_EXECUTOR = ProcessPoolExecutor(max_workers=min(8, os.cpu_count() or 1))
+UPLOAD_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+def _run_generator(func, *args):
+    """Await a generator function on the process pool."""
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(GENERATE_EXECUTOR, func, *args)
+
+def _generate_docx_bytes(text, template_name, title, author):
+    """Picklable wrapper: generate_docx returns a BytesIO, which can't
+    cross a process boundary."""
+    from generators.docx_generator import generate_docx
+    return generate_docx(text, template_name, title, author).getvalue()
+
+def _generate_docx_chapter_bytes(chapters, template_name, book_title, book_author):
+    """As above, for the pre-parsed chapters variant."""
+    from generators.docx_generator import generate_docx_from_chapters
+    return generate_docx_from_chapters(chapters, template_name, book_title, book_author).getvalue()
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-@app.route('/')
-def home():
-    return jsonify({
-        "message": "Ebook Formatter API",
-        "version": "1.0.0",
-        "endpoints": [
-            "/api/generate-epub",
-            "/api/generate-pdf", 
-            "/api/generate-docx"
-        ]
-    })
-
-@app.route('/api/generate-epub', methods=['POST'])
-def generate_epub_endpoint():
-    try:
-        data = request.json
-        text = data.get('text', '')
-        template_name = data.get('template_name', 'classic')
-        title = data.get('title', 'Untitled Book')
-        author = data.get('author', 'Anonymous')
-        
-        if not text:
-            return jsonify({'error': 'No text provided'}), 400
-            
-        # Generate EPUB file
-        epub_data = generate_epub(text, template_name, title, author)
-        
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.epub')
-        temp_file.write(epub_data)
-        temp_file.close()
-        
-        return send_file(
-            temp_file.name,
-            as_attachment=True,
-            download_name=f"{title.replace(' ', '_')}.epub",
-            mimetype='application/epub+zip'
-        )
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/generate-pdf', methods=['POST'])
-def generate_pdf_endpoint():
-    try:
-        data = request.json
-        text = data.get('text', '')
-        template_name = data.get('template_name', 'classic')
-        title = data.get('title', 'Untitled Book')
-        author = data.get('author', 'Anonymous')
-        
-        if not text:
-            return jsonify({'error': 'No text provided'}), 400
-            
-        # Generate PDF file
-        pdf_data = generate_pdf(text, template_name, title, author)
-        
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-        temp_file.write(pdf_data)
-        temp_file.close()
-        
-        return send_file(
-            temp_file.name,
-            as_attachment=True,
-            download_name=f"{title.replace(' ', '_')}.pdf",
-            mimetype='application/pdf'
-        )
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/generate-docx', methods=['POST'])
-def generate_docx_endpoint():
-    try:
-        data = request.json
-        text = data.get('text', '')
-        template_name = data.get('template_name', 'classic')
-        title = data.get('title', 'Untitled Book')
-        author = data.get('author', 'Anonymous')
-        
-        if not text:
-            return jsonify({'error': 'No text provided'}), 400
-            
-        # Generate DOCX file
-        docx_data = generate_docx(text, template_name, title, author)
-        
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.docx')
-        temp_file.write(docx_data.getvalue())
-        temp_file.close()
-        
-        return send_file(
-            temp_file.name,
-            as_attachment=True,
-            download_name=f"{title.replace(' ', '_')}.docx",
-            mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-        )
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/upload-document', methods=['POST'])
-def upload_document():
-    """Handle document upload and text extraction"""
-    try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file provided'}), 400
-        
-        file = request.files['file']
-        
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'File type not supported. Please upload .txt, .docx, or .pdf files'}), 400
-        
-        # Read file data
-        file_data = file.read()
-        
-        # Extract text from file
-        extracted_text, file_type = extract_text_from_file(file_data, file.filename)
-        
-        # Analyze document structure
-        structure = detect_document_structure(extracted_text)
-        
+# Sanitize titles for Content-Disposition filenames in one translate
+# pass: path separators and spaces become underscores, quotes and
+# newlines are dropped entirely
+_FILENAME_TABLE = str.maketrans({
+    ' ': '_', '/': '_', '\\': '_',
+    '\n': None, '\r': None, '"': None, "'": None,
+})
+
+def create_app() -> Quart:
+    """Application factory: build and configure the Quart app.
+
+    Keeping configuration and route registration here (rather than as
+    import side effects) means the module can be imported twice without
+    re-registering routes, and preloading servers can fork workers that
+    share the app's memory copy-on-write.
+    """
+    app = cors(Quart(__name__))  # Enable CORS for all domains on all routes
+
+    # Configure file uploads
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+
+    @app.route('/')
+    async def home():
         return jsonify({
-            'text': extracted_text,
-            'file_type': file_type,
-            'filename': file.filename,
-            'structure': structure
+            "message": "Ebook Formatter API",
+            "version": "1.0.0",
+            "endpoints": [
+                "/api/generate-epub",
+                "/api/generate-pdf",
+                "/api/generate-docx"
+            ]
         })
-        
-    except Exception as e:
-        return jsonify({'error': f'Error processing file: {str(e)}'}), 500
-
-@app.route('/api/templates', methods=['GET'])
-def get_templates():
-    """Get available styling templates"""
-    templates = {
-        'classic': {
-            'name': 'Classic',
-            'description': 'Traditional book styling with serif fonts'
-        },
-        'modern': {
-            'name': 'Modern',
-            'description': 'Clean, contemporary design with sans-serif fonts'
-        },
-        'elegant': {
-            'name': 'Elegant',
-            'description': 'Sophisticated typography with elegant spacing'
-        },
-        'scifi': {
-            'name': 'Sci-Fi',
-            'description': 'Futuristic styling perfect for science fiction'
+
+    @app.route('/api/generate-epub', methods=['POST'])
+    async def generate_epub_endpoint():
+        from generators.epub_generator import generate_epub
+        try:
+            data = await request.get_json()
+            text = data.get('text', '')
+            template_name = data.get('template_name', 'classic')
+            title = data.get('title', 'Untitled Book')
+            author = data.get('author', 'Anonymous')
+
+            if not text:
+                return jsonify({'error': 'No text provided'}), 400
+
+            safe_title = title.translate(_FILENAME_TABLE)
+
+            # Generate EPUB file on the process pool
+            epub_data = await _run_generator(generate_epub, text, template_name, title, author)
+
+            # Stream the generated bytes directly; no temp file on disk
+            return await send_file(
+                io.BytesIO(epub_data),
+                as_attachment=True,
+                attachment_filename=f"{safe_title}.epub",
+                mimetype='application/epub+zip'
+            )
+
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/generate-pdf', methods=['POST'])
+    async def generate_pdf_endpoint():
+        from generators.pdf_generator import generate_pdf
+        try:
+            data = await request.get_json()
+            text = data.get('text', '')
+            template_name = data.get('template_name', 'classic')
+            title = data.get('title', 'Untitled Book')
+            author = data.get('author', 'Anonymous')
+
+            if not text:
+                return jsonify({'error': 'No text provided'}), 400
+
+            safe_title = title.translate(_FILENAME_TABLE)
+
+            # Generate PDF file on the process pool
+            pdf_data = await _run_generator(generate_pdf, text, template_name, title, author)
+
+            # Stream the generated bytes directly; no temp file on disk
+            return await send_file(
+                io.BytesIO(pdf_data),
+                as_attachment=True,
+                attachment_filename=f"{safe_title}.pdf",
+                mimetype='application/pdf'
+            )
+
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/generate-docx', methods=['POST'])
+    async def generate_docx_endpoint():
+        try:
+            data = await request.get_json()
+            text = data.get('text', '')
+            template_name = data.get('template_name', 'classic')
+            title = data.get('title', 'Untitled Book')
+            author = data.get('author', 'Anonymous')
+
+            if not text:
+                return jsonify({'error': 'No text provided'}), 400
+
+            safe_title = title.translate(_FILENAME_TABLE)
+
+            # Generate DOCX file on the process pool
+            docx_data = await _run_generator(_generate_docx_bytes, text, template_name, title, author)
+
+            return await send_file(
+                io.BytesIO(docx_data),
+                as_attachment=True,
+                attachment_filename=f"{safe_title}.docx",
+                mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+            )
+
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/generate-bundle', methods=['POST'])
+    async def generate_bundle_endpoint():
+        """Generate all three formats in one request, parsing the text once."""
+        from generators.text_parser import parse_book
+        from generators.epub_generator import generate_epub_from_chapters
+        from generators.pdf_generator import generate_pdf_from_chapters
+        try:
+            data = await request.get_json()
+            text = data.get('text', '')
+            template_name = data.get('template_name', 'classic')
+            title = data.get('title', 'Untitled Book')
+            author = data.get('author', 'Anonymous')
+
+            if not text:
+                return jsonify({'error': 'No text provided'}), 400
+
+            safe_title = title.translate(_FILENAME_TABLE)
+
+            # Parse once, then fan the pre-parsed chapters out to the
+            # process pool so the three formats render in parallel
+            loop = asyncio.get_running_loop()
+            extracted_title, chapters = await loop.run_in_executor(
+                UPLOAD_EXECUTOR, parse_book, text
+            )
+            book_title = title if title and title != 'Untitled Book' else extracted_title
+            book_author = author if author and author != 'Anonymous' else 'Anonymous'
+            identifier = 'ebook-formatter-' + hashlib.blake2b(
+                text.encode('utf-8'), digest_size=8).hexdigest()
+
+            epub_data, pdf_data, docx_data = await asyncio.gather(
+                _run_generator(generate_epub_from_chapters, chapters,
+                               template_name, book_title, book_author, identifier),
+                _run_generator(generate_pdf_from_chapters, chapters,
+                               template_name, book_title, book_author),
+                _run_generator(_generate_docx_chapter_bytes, chapters,
+                               template_name, book_title, book_author),
+            )
+
+            # Ship the three files as one ZIP
+            bundle = io.BytesIO()
+            with zipfile.ZipFile(bundle, 'w', zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr(f"{safe_title}.epub", epub_data)
+                archive.writestr(f"{safe_title}.pdf", pdf_data)
+                archive.writestr(f"{safe_title}.docx", docx_data)
+            bundle.seek(0)
+
+            return await send_file(
+                bundle,
+                as_attachment=True,
+                attachment_filename=f"{safe_title}.zip",
+                mimetype='application/zip'
+            )
+
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/upload-document', methods=['POST'])
+    async def upload_document():
+        """Handle document upload and text extraction"""
+        from generators.document_parser import extract_text_from_file, detect_document_structure
+        try:
+            files = await request.files
+            if 'file' not in files:
+                return jsonify({'error': 'No file provided'}), 400
+
+            file = files['file']
+
+            if file.filename == '':
+                return jsonify({'error': 'No file selected'}), 400
+
+            if not allowed_file(file.filename):
+                return jsonify({'error': 'File type not supported. Please upload .txt, .docx, or .pdf files'}), 400
+
+            # Hand the upload's spooled stream straight to the parsers; no
+            # full in-memory copy via file.read()
+            loop = asyncio.get_running_loop()
+            extracted_text, file_type = await loop.run_in_executor(
+                UPLOAD_EXECUTOR, extract_text_from_file, file.stream, file.filename
+            )
+            structure = await loop.run_in_executor(
+                UPLOAD_EXECUTOR, detect_document_structure, extracted_text
+            )
+
+            return jsonify({
+                'text': extracted_text,
+                'file_type': file_type,
+                'filename': file.filename,
+                'structure': structure
+            })
+
+        except Exception as e:
+            return jsonify({'error': f'Error processing file: {str(e)}'}), 500
+
+    @app.route('/api/templates', methods=['GET'])
+    async def get_templates():
+        """Get available styling templates"""
+        templates = {
+            'classic': {
+                'name': 'Classic',
+                'description': 'Traditional book styling with serif fonts'
+            },
+            'modern': {
+                'name': 'Modern',
+                'description': 'Clean, contemporary design with sans-serif fonts'
+            },
+            'elegant': {
+                'name': 'Elegant',
+                'description': 'Sophisticated typography with elegant spacing'
+            },
+            'scifi': {
+                'name': 'Sci-Fi',
+                'description': 'Futuristic styling perfect for science fiction'
+            }
         }
-    }
-    return jsonify(templates)
+        return jsonify(templates)
+
+    return app
+
+app = create_app()
 
+# In production run under an ASGI server, e.g.:
+#   hypercorn app:app --bind 0.0.0.0:$PORT --workers 4
 if __name__ == '__main__':
-    # Ensure generators directory exists
-    os.makedirs('generators', exist_ok=True)
-    
     # Get port from environment variable or default to 5000
     port = int(os.environ.get('PORT', 5000))
-    
+
     # Run in debug mode only in development
-    debug_mode = os.environ.get('FLASK_ENV') == 'development'
-    
+    debug_mode = os.environ.get('QUART_ENV') == 'development'
+
     app.run(debug=debug_mode, host='0.0.0.0', port=port)
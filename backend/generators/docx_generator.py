@@ -3,7 +3,7 @@ from docx import Document
 from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.style import WD_STYLE_TYPE
-from .text_parser import parse_text, extract_title_and_chapters
+from .text_parser import parse_book
 
 def generate_docx(text: str, template_name: str, title: str = None, author: str = None) -> io.BytesIO:
     """
@@ -18,14 +18,29 @@ def generate_docx(text: str, template_name: str, title: str = None, author: str
     Returns:
         io.BytesIO: Word document data
     """
-    # Parse the text content
-    content_blocks = parse_text(text)
-    extracted_title, chapters = extract_title_and_chapters(content_blocks)
-    
+    # Parse the text content (cached per text body)
+    extracted_title, chapters = parse_book(text)
+
     # Use provided title or extracted title
     book_title = title if title and title != 'Untitled Book' else extracted_title
     book_author = author if author and author != 'Anonymous' else 'Anonymous'
-    
+
+    return generate_docx_from_chapters(chapters, template_name, book_title, book_author)
+
+def generate_docx_from_chapters(chapters, template_name: str, book_title: str,
+                                book_author: str) -> io.BytesIO:
+    """
+    Generate a Word document from already-parsed chapters.
+
+    Args:
+        chapters: Parsed chapter dicts (e.g. from parse_book)
+        template_name: Name of the styling template to use
+        book_title: Resolved book title
+        book_author: Resolved author name
+
+    Returns:
+        io.BytesIO: Word document data
+    """
     # Create new document
     doc = Document()
     
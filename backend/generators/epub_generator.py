@@ -1,8 +1,36 @@
+import hashlib
 import io
+from concurrent.futures import ThreadPoolExecutor
 from ebooklib import epub
-from .text_parser import parse_text, extract_title_and_chapters
+from lxml import etree
+from lxml.builder import ElementMaker
+from .text_parser import parse_book
 from .templates import get_template_css
 
+# XHTML element factory; lxml escapes text and serializes in C, which is
+# much faster than formatting thousands of paragraphs in Python
+_XHTML_NS = 'http://www.w3.org/1999/xhtml'
+_E = ElementMaker(namespace=_XHTML_NS, nsmap={None: _XHTML_NS})
+
+def _render_chapter_xhtml(chapter) -> bytes:
+    """Serialize one chapter dict to an XHTML document."""
+    root = _E.html(
+        _E.head(
+            _E.title(chapter['title']),
+            _E.link(rel='stylesheet', type='text/css', href='style/nav.css'),
+        ),
+        _E.body(
+            _E(f"h{chapter['level']}", {'class': 'chapter-heading'}, chapter['title']),
+            *(_E.p({'class': 'paragraph'}, paragraph) for paragraph in chapter['content']),
+        ),
+    )
+    return etree.tostring(
+        root,
+        xml_declaration=True,
+        encoding='utf-8',
+        doctype='<!DOCTYPE html>',
+    )
+
 def generate_epub(text: str, template_name: str, title: str = None, author: str = None) -> bytes:
     """
     Generate an EPUB file from text content with specified template styling.
@@ -16,19 +44,46 @@ def generate_epub(text: str, template_name: str, title: str = None, author: str
     Returns:
         bytes: EPUB file data
     """
-    # Parse the text content
-    content_blocks = parse_text(text)
-    extracted_title, chapters = extract_title_and_chapters(content_blocks)
-    
+    # Parse the text content (cached per text body)
+    extracted_title, chapters = parse_book(text)
+
     # Use provided title or extracted title
     book_title = title if title and title != 'Untitled Book' else extracted_title
     book_author = author if author and author != 'Anonymous' else 'Anonymous'
-    
+
+    # A truncated cryptographic digest is stable across runs and
+    # collision-safe, unlike the salted built-in hash()
+    text_digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+    return generate_epub_from_chapters(
+        chapters, template_name, book_title, book_author,
+        identifier='ebook-formatter-' + text_digest,
+    )
+
+def generate_epub_from_chapters(chapters, template_name: str, book_title: str,
+                                book_author: str, identifier: str = None) -> bytes:
+    """
+    Generate an EPUB file from already-parsed chapters.
+
+    Args:
+        chapters: Parsed chapter dicts (e.g. from parse_book)
+        template_name: Name of the styling template to use
+        book_title: Resolved book title
+        book_author: Resolved author name
+        identifier: EPUB identifier (optional, derived from the title
+            if not provided)
+
+    Returns:
+        bytes: EPUB file data
+    """
     # Create EPUB book
     book = epub.EpubBook()
-    
+
     # Set metadata
-    book.set_identifier('ebook-formatter-' + str(hash(text))[:10])
+    if identifier is None:
+        title_digest = hashlib.blake2b(book_title.encode('utf-8'), digest_size=8).hexdigest()
+        identifier = 'ebook-formatter-' + title_digest
+    book.set_identifier(identifier)
     book.set_title(book_title)
     book.set_language('en')
     book.add_author(book_author)
@@ -45,32 +100,21 @@ def generate_epub(text: str, template_name: str, title: str = None, author: str
     )
     book.add_item(nav_css)
     
-    # Create chapters
+    # Render chapter XHTML in parallel; serialization is lxml/C-bound, so
+    # threads overlap usefully despite the GIL
+    if len(chapters) > 1:
+        with ThreadPoolExecutor(max_workers=min(8, len(chapters))) as executor:
+            rendered = list(executor.map(_render_chapter_xhtml, chapters))
+    else:
+        rendered = [_render_chapter_xhtml(chapter) for chapter in chapters]
+
+    # Assemble the book sequentially; ebooklib itself is not thread-safe
     epub_chapters = []
     spine = ['nav']
-    
-    for i, chapter in enumerate(chapters):
-        chapter_id = f'chapter_{i+1}'
+
+    for i, (chapter, chapter_html) in enumerate(zip(chapters, rendered)):
         chapter_filename = f'chapter_{i+1}.xhtml'
-        
-        # Build chapter content
-        chapter_html = f'''<?xml version="1.0" encoding="utf-8"?>
-<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml">
-<head>
-    <title>{chapter['title']}</title>
-    <link rel="stylesheet" type="text/css" href="style/nav.css"/>
-</head>
-<body>
-    <h{chapter['level']} class="chapter-heading">{chapter['title']}</h{chapter['level']}>
-'''
-        
-        for paragraph in chapter['content']:
-            chapter_html += f'    <p class="paragraph">{paragraph}</p>\n'
-        
-        chapter_html += '''</body>
-</html>'''
-        
+
         # Create EPUB chapter
         epub_chapter = epub.EpubHtml(
             title=chapter['title'],
@@ -1,3 +1,4 @@
+import html
 import io
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter, A4
@@ -5,7 +6,26 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
-from .text_parser import parse_text, extract_title_and_chapters
+from .text_parser import parse_book
+from .templates import get_template_css
+
+try:
+    # Preferred engine: lays out the same HTML+CSS the EPUB path uses,
+    # with the heavy lifting in C. Needs native pango/cairo libraries,
+    # so ReportLab stays as the fallback.
+    from weasyprint import HTML, CSS
+except (ImportError, OSError):
+    HTML = None
+
+# Escape table for ReportLab's XML-ish paragraph markup; one
+# str.translate pass replaces three full-string .replace scans
+_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+# Styles are immutable once built, so cache them per template instead of
+# recreating three ParagraphStyle objects on every request. The spacer
+# between paragraphs is stateless and can be one shared flowable.
+_STYLE_CACHE = {}
+_PARA_SPACER = Spacer(1, 12)
 
 def generate_pdf(text: str, template_name: str, title: str = None, author: str = None) -> bytes:
     """
@@ -20,14 +40,61 @@ def generate_pdf(text: str, template_name: str, title: str = None, author: str =
     Returns:
         bytes: PDF file data
     """
-    # Parse the text content
-    content_blocks = parse_text(text)
-    extracted_title, chapters = extract_title_and_chapters(content_blocks)
-    
+    # Parse the text content (cached per text body)
+    extracted_title, chapters = parse_book(text)
+
     # Use provided title or extracted title
     book_title = title if title and title != 'Untitled Book' else extracted_title
     book_author = author if author and author != 'Anonymous' else 'Anonymous'
-    
+
+    return generate_pdf_from_chapters(chapters, template_name, book_title, book_author)
+
+def generate_pdf_from_chapters(chapters, template_name: str, book_title: str,
+                               book_author: str) -> bytes:
+    """
+    Generate a PDF file from already-parsed chapters.
+
+    Args:
+        chapters: Parsed chapter dicts (e.g. from parse_book)
+        template_name: Name of the styling template to use
+        book_title: Resolved book title
+        book_author: Resolved author name
+
+    Returns:
+        bytes: PDF file data
+    """
+    if HTML is not None:
+        full_html = _build_book_html(book_title, book_author, chapters)
+        return HTML(string=full_html).write_pdf(
+            stylesheets=[CSS(string=get_template_css(template_name))]
+        )
+
+    return _generate_pdf_reportlab(book_title, book_author, chapters, template_name)
+
+def _build_book_html(book_title: str, book_author: str, chapters) -> str:
+    """Build one HTML document (title page + chapters) for WeasyPrint,
+    styled by the same template CSS the EPUB output uses."""
+    parts = [
+        '<!DOCTYPE html>\n<html>\n<head>'
+        f'<meta charset="utf-8"/><title>{html.escape(book_title)}</title>'
+        '</head>\n<body>\n',
+        f'<h1 class="book-title">{html.escape(book_title)}</h1>\n',
+        f'<p class="book-author">by {html.escape(book_author)}</p>\n',
+    ]
+    for chapter in chapters:
+        level = chapter['level']
+        parts.append(
+            f'<h{level} class="chapter-heading">{html.escape(chapter["title"])}</h{level}>\n'
+        )
+        parts.extend(
+            f'<p class="paragraph">{html.escape(paragraph)}</p>\n'
+            for paragraph in chapter['content']
+        )
+    parts.append('</body>\n</html>')
+    return ''.join(parts)
+
+def _generate_pdf_reportlab(book_title: str, book_author: str, chapters, template_name: str) -> bytes:
+    """ReportLab/platypus fallback used when WeasyPrint isn't available."""
     # Create PDF buffer
     buffer = io.BytesIO()
     
@@ -68,9 +135,9 @@ def generate_pdf(text: str, template_name: str, title: str = None, author: str =
         # Add chapter content
         for paragraph_text in chapter['content']:
             # Clean up the text for PDF
-            clean_text = paragraph_text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            clean_text = paragraph_text.translate(_ESCAPE_TABLE)
             story.append(Paragraph(clean_text, paragraph_style))
-            story.append(Spacer(1, 12))
+            story.append(_PARA_SPACER)
     
     # Build PDF
     doc.build(story)
@@ -81,8 +148,12 @@ def generate_pdf(text: str, template_name: str, title: str = None, author: str =
 
 def get_template_styles(base_styles, template_name: str):
     """
-    Create template-specific styles for PDF generation.
+    Create template-specific styles for PDF generation (cached per template).
     """
+    cached = _STYLE_CACHE.get(template_name)
+    if cached is not None:
+        return cached
+
     if template_name == 'classic':
         title_style = ParagraphStyle(
             'CustomTitle',
@@ -188,5 +259,6 @@ def get_template_styles(base_styles, template_name: str):
     
     else:  # Default to classic
         return get_template_styles(base_styles, 'classic')
-    
-    return title_style, heading_style, paragraph_style
+
+    _STYLE_CACHE[template_name] = (title_style, heading_style, paragraph_style)
+    return _STYLE_CACHE[template_name]
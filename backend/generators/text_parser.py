@@ -1,41 +1,150 @@
+"""Plain-text book parsing: line classification, chapter extraction.
+
+This module is deliberately self-contained, fully annotated and free of
+dynamic tricks (no monkey-patching, no __getattr__, no C extensions of
+its own), so it stays compatible with ahead-of-time compilers such as
+mypyc/Cython and with PyPy's JIT should the hot path ever need them.
+"""
+
+import hashlib
 import re
-from typing import List, Dict, Tuple
+from collections import deque, namedtuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Intermediate content blocks are namedtuples rather than per-line dicts:
+# a 300k-line book no longer allocates 300k small dicts, and downstream
+# code branches on an integer kind instead of comparing tag strings
+# (which also sidesteps the per-block 'chapter'/'paragraph' string
+# references that interning would otherwise have been needed to dedupe)
+KIND_PARAGRAPH = 0
+KIND_CHAPTER = 1
+
+Block = namedtuple('Block', ('kind', 'content', 'level'))
+
+# Heading patterns are compiled once at import. Classification runs for
+# every line of the book, and rebuilding pattern lists plus dispatching
+# up to twenty re.match calls per heading line (is_chapter_heading and
+# then get_heading_level again) dominated parse time. One alternation
+# with named groups answers both "is this a heading" and "what level"
+# in a single pass: the matching group determines the level.
+_HEADING_RE = re.compile(
+    r'^(?:'
+    r'(?P<ch>chapter\s+(?:\d+|[ivxlcdm]+)|ch\s+\d+|\d+\.\s)'  # incl. Roman numerals, "1. Title"
+    r'|(?P<pb>(?:part|book)\s+(?:\d+|[ivxlcdm]+))'
+    r'|(?P<pe>prologue|epilogue)$'
+    r'|(?P<ip>introduction|preface)$'
+    r'|(?P<ack>acknowledge?ments?|about\s+the\s+author)$'
+    r')',
+    re.IGNORECASE
+)
+_GROUP_LEVELS = {'ch': 1, 'pb': 1, 'pe': 1, 'ip': 2, 'ack': 3}
+
+# Title words for the short-line fallback in _classify_line: one C-level
+# scan of the line instead of five Python-level substring searches
+_TITLE_WORDS_RE = re.compile(r'chapter|prologue|epilogue|part|book', re.IGNORECASE)
+
+# Sentence punctuation that rules a short line out as a title
+_PARA_ENDS = ('.', ',')
+
+# Every _HEADING_RE alternative starts with one of these characters, so
+# a single set lookup skips the regex engine entirely for the vast
+# majority of prose lines (same cheap-prefilter idea RE2/Hyperscan use)
+_HEADING_FIRST_CHARS = frozenset('cpbieaCPBIEA0123456789')
 
-def parse_text(text: str) -> List[Dict[str, str]]:
+# Matches each non-blank line with surrounding whitespace trimmed
+# (group 1 is equivalent to line.strip()); iterating this keeps the
+# whole tokenization inside the C regex engine and never materializes
+# blank lines at all
+_NONBLANK_LINE_RE = re.compile(r'^[^\S\n]*(\S[^\n]*?)[^\S\n]*$', re.MULTILINE)
+
+# Numbered-chapter test for extract_title_and_chapters; case-insensitive
+# so no lowercased copy of the heading is allocated
+_CH_NUM_RE = re.compile(r'^chapter\s+\d+', re.IGNORECASE)
+
+# Precompiled level tests for get_heading_level
+_LVL1_CHAPTER_RE = re.compile(r'^chapter\s+\d+')
+_LVL1_PART_BOOK_RE = re.compile(r'^(?:part|book)\s+')
+_LVL3_BACK_MATTER_RE = re.compile(r'^(?:acknowledge?ments?|about\s+the\s+author)$')
+
+def parse_book(text: str) -> Tuple[str, List[Dict[str, str]]]:
     """
-    Parse raw text into structured content with chapters and paragraphs.
-    
+    Parse text into (title, chapters), caching the result per text body.
+
+    Users typically request the same book in several formats back to
+    back (EPUB, then PDF, then DOCX); the cache lets the second and
+    third request skip the parse entirely. Callers must not mutate the
+    returned chapters.
+
     Args:
         text (str): Raw text input from user
-        
+
     Returns:
-        List[Dict]: List of content blocks with type and content
+        Tuple of (book_title, chapters_list)
     """
-    if not text.strip():
-        return []
-    
-    lines = text.strip().split('\n')
-    content_blocks = []
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Check if line is a chapter heading
-        if is_chapter_heading(line):
-            content_blocks.append({
-                'type': 'chapter',
-                'content': line,
-                'level': get_heading_level(line)
-            })
+    text_hash = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+    return _parse_book_cached(text_hash, text)
+
+@lru_cache(maxsize=32)
+def _parse_book_cached(text_hash: str, text: str) -> Tuple[str, List[Dict[str, str]]]:
+    # Stream blocks straight into chapter extraction; the intermediate
+    # block list for a whole book is never materialized
+    return extract_title_and_chapters(_iter_blocks(text))
+
+def _iter_blocks(text: str):
+    """Yield Block tuples for each non-blank line of the text."""
+    for match in _NONBLANK_LINE_RE.finditer(text):
+        line = match.group(1)
+
+        # Classify the line; one pass answers heading-or-not and level
+        level = _classify_line(line)
+        if level is not None:
+            yield Block(KIND_CHAPTER, line, level)
         else:
-            content_blocks.append({
-                'type': 'paragraph',
-                'content': line
-            })
-    
-    return content_blocks
+            yield Block(KIND_PARAGRAPH, line, 0)
+
+def parse_text(text: str) -> List[Block]:
+    """
+    Parse raw text into structured content with chapters and paragraphs.
+
+    Args:
+        text (str): Raw text input from user
+
+    Returns:
+        List[Block]: Content blocks (kind, content, level); level is 0
+            for paragraphs
+    """
+    return list(_iter_blocks(text))
+
+def _classify_line(line: str) -> Optional[int]:
+    """
+    Classify a stripped line: heading level (1-6) or None for a paragraph.
+    """
+    # Common chapter patterns; the pattern is case-insensitive, so no
+    # lowercased copy of the line is allocated, and the matched group
+    # determines the level. The first-character prefilter avoids even
+    # entering the regex engine for ordinary prose lines.
+    if line and line[0] in _HEADING_FIRST_CHARS:
+        match = _HEADING_RE.match(line)
+        if match:
+            return _GROUP_LEVELS[match.lastgroup]
+
+    # Fallbacks (always level 1): a short all-caps line is likely a
+    # title, as is a short line containing a typical title word that
+    # doesn't end with sentence punctuation. The O(1) length checks run
+    # first so long prose lines never pay for the O(n) scans.
+    # A lowercase final character already decides isupper() False, so
+    # checking it first skips the full scan for most mixed-case lines
+    # (punctuation or digits at the end still fall through to the scan)
+    n = len(line)
+    if n < 50 and not line[-1:].islower() and line.isupper():
+        return 1
+
+    if n < 100 and not line.endswith(_PARA_ENDS):
+        if _TITLE_WORDS_RE.search(line):
+            return 1
+
+    return None
 
 def is_chapter_heading(line: str) -> bool:
     """
@@ -47,44 +156,7 @@ def is_chapter_heading(line: str) -> bool:
     Returns:
         bool: True if line appears to be a chapter heading
     """
-    line_lower = line.lower().strip()
-    
-    # Common chapter patterns
-    chapter_patterns = [
-        r'^chapter\s+\d+',
-        r'^chapter\s+[ivxlcdm]+',  # Roman numerals
-        r'^ch\s+\d+',
-        r'^\d+\.\s',  # "1. Chapter title"
-        r'^prologue$',
-        r'^epilogue$',
-        r'^introduction$',
-        r'^preface$',
-        r'^acknowledgments?$',
-        r'^acknowledgements?$',
-        r'^about\s+the\s+author$',
-        r'^part\s+[ivxlcdm]+',
-        r'^part\s+\d+',
-        r'^book\s+[ivxlcdm]+',
-        r'^book\s+\d+'
-    ]
-    
-    for pattern in chapter_patterns:
-        if re.match(pattern, line_lower):
-            return True
-    
-    # Check if line is all caps and short (likely a title)
-    if line.isupper() and len(line) < 50:
-        return True
-    
-    # Check if line is significantly shorter than average paragraph
-    # and doesn't end with punctuation (except question/exclamation marks for titles)
-    if len(line) < 100 and not line.endswith(('.', ',')):
-        # Additional check: if it contains typical title words
-        title_words = ['chapter', 'prologue', 'epilogue', 'part', 'book']
-        if any(word in line_lower for word in title_words):
-            return True
-    
-    return False
+    return _classify_line(line.strip()) is not None
 
 def get_heading_level(line: str) -> int:
     """
@@ -97,15 +169,15 @@ def get_heading_level(line: str) -> int:
         int: Heading level (1-6)
     """
     line_lower = line.lower().strip()
-    
+
     # Main chapters are level 1
-    if re.match(r'^chapter\s+\d+', line_lower):
+    if _LVL1_CHAPTER_RE.match(line_lower):
         return 1
-    
+
     # Parts/Books are higher level (smaller number = higher level)
-    if re.match(r'^(part|book)\s+', line_lower):
+    if _LVL1_PART_BOOK_RE.match(line_lower):
         return 1
-    
+
     # Prologue, epilogue are level 1
     if line_lower in ['prologue', 'epilogue']:
         return 1
@@ -115,58 +187,60 @@ def get_heading_level(line: str) -> int:
         return 2
     
     # Acknowledgments, about author are level 3
-    if re.match(r'^(acknowledgments?|acknowledgements?|about\s+the\s+author)$', line_lower):
+    if _LVL3_BACK_MATTER_RE.match(line_lower):
         return 3
     
     # Default to level 1 for other headings
     return 1
 
-def extract_title_and_chapters(content_blocks: List[Dict[str, str]]) -> Tuple[str, List[Dict[str, str]]]:
+def extract_title_and_chapters(content_blocks) -> Tuple[str, List[Dict[str, str]]]:
     """
     Extract book title and organize chapters.
-    
+
     Args:
-        content_blocks: List of parsed content blocks
-        
+        content_blocks: Iterable of parsed content blocks; consumed in a
+            single pass, so a generator works as well as a list
+
     Returns:
         Tuple of (book_title, chapters_list)
     """
-    if not content_blocks:
-        return "Untitled Book", []
-    
     title = "Untitled Book"
     chapters = []
     current_chapter = None
-    
+    title_set = False
+
     for block in content_blocks:
-        if block['type'] == 'chapter':
+        if block.kind == KIND_CHAPTER:
             # If we have a previous chapter, save it
             if current_chapter:
                 chapters.append(current_chapter)
-            
-            # Start new chapter
+
+            # Start new chapter; content is a deque because appends are
+            # always O(1) with no list-resize copying, and the
+            # generators only ever iterate it
             current_chapter = {
-                'title': block['content'],
-                'level': block['level'],
-                'content': []
+                'title': block.content,
+                'level': block.level,
+                'content': deque()
             }
-            
+
             # If this is the first heading and looks like a book title, use it
-            if not chapters and len(chapters) == 0 and not re.match(r'^chapter\s+\d+', block['content'].lower()):
-                title = block['content']
-            
-        elif block['type'] == 'paragraph':
+            if not title_set and not chapters and not _CH_NUM_RE.match(block.content):
+                title = block.content
+            title_set = True
+
+        elif block.kind == KIND_PARAGRAPH:
             if current_chapter:
-                current_chapter['content'].append(block['content'])
+                current_chapter['content'].append(block.content)
             else:
                 # Content before any chapter heading - create a default chapter
                 if not current_chapter:
                     current_chapter = {
                         'title': 'Chapter 1',
                         'level': 1,
-                        'content': []
+                        'content': deque()
                     }
-                current_chapter['content'].append(block['content'])
+                current_chapter['content'].append(block.content)
     
     # Don't forget the last chapter
     if current_chapter: